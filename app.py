@@ -1,13 +1,513 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.io as pio
 from simulation import simulate_fee_change
+from data_io import load_data, file_signature, data_path
 
 st.set_page_config(page_title="H-1B / OPT / CPT Policy Simulation", layout="wide")
 
+# Serialize figures with orjson (C encoder) when available
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = "orjson"
+except ImportError:
+    pass
+
+# ==============================================================
+# CACHED AGGREGATIONS (independent of the Tab 2 sliders)
+# ==============================================================
+# The loaded frame is shared and never mutated, so its id() is a stable cache key
+FRAME_BY_ID = {pd.DataFrame: id}
+
+@st.cache_data(hash_funcs=FRAME_BY_ID)
+def year_summary(df):
+    """Per-year approvals, denials and pathway counts, plus distinct employers."""
+    # One np.bincount per column over integer year offsets (no pandas group index)
+    year = df["Year"].to_numpy()
+    first = year.min()
+    offset = year - first
+    summary = pd.DataFrame({"Year": np.arange(first, year.max() + 1)})
+    for col in ["Total_Approvals", "Total_Denials", "Fortune500", "OPT_friendly", "CPT_friendly"]:
+        weights = df[col].to_numpy(dtype=np.float64, na_value=0)
+        summary[col] = np.bincount(offset, weights=weights).astype(np.int64)
+
+    # Distinct employers per year: flag each (year offset, employer code) pair in a
+    # boolean table and count flags per row (no hashing or sorting of pairs)
+    employer = df["Employer_std"]
+    codes = employer.cat.codes.to_numpy()
+    named = codes >= 0
+    seen = np.zeros((len(summary), len(employer.cat.categories)), dtype=bool)
+    seen[offset[named], codes[named]] = True
+    summary["Total_Employers"] = seen.sum(axis=1)
+
+    # Keep only years that occur in the data, as groupby would
+    return summary[np.bincount(offset) > 0].reset_index(drop=True)
+
+@st.cache_data(hash_funcs=FRAME_BY_ID)
+def top_employers(df, n=10):
+    """Top-n employers by approvals, sorted ascending for a horizontal bar chart."""
+    # Sum approvals per categorical code in one bincount pass, then partial-sort the top n
+    employer = df["Employer"]
+    codes = employer.cat.codes.to_numpy()
+    named = codes >= 0
+    totals = np.bincount(
+        codes[named],
+        weights=df["Total_Approvals"].to_numpy(dtype=np.float64)[named],
+        minlength=len(employer.cat.categories),
+    )
+    # Partial-sort only when there are more employers than requested
+    k = min(n, len(totals))
+    top = np.argpartition(-totals, k)[:k] if k < len(totals) else np.arange(k)
+    top = top[np.argsort(totals[top], kind="stable")]
+    return pd.DataFrame({
+        "Employer": employer.cat.categories[top],
+        "Total_Approvals": totals[top].astype(np.int64),
+    })
+
+@st.cache_data(hash_funcs=FRAME_BY_ID)
+def sector_summary(df):
+    """Aggregate approvals and flexibility shares by sector, with min-max adaptive score."""
+    summary = (
+        df.groupby("Sector", observed=True, sort=False)
+        .agg(
+            Total_Approvals=("Total_Approvals", "sum"),
+            mean_flex=("Flexibility_Index", "mean"),
+            share_opt=("OPT_friendly", "mean"),
+            share_cpt=("CPT_friendly", "mean"),
+            share_f500=("Fortune500", "mean"),
+        )
+        .reset_index()
+    )
+
+    # --- Min-max normalize all four indicators in one vectorized pass ---
+    cols = ["mean_flex", "share_opt", "share_cpt", "share_f500"]
+    values = summary[cols].to_numpy(dtype=np.float64)
+    low = values.min(axis=0)
+    spread = values.max(axis=0) - low
+    norm = (values - low) / np.where(spread == 0, 1e-9, spread)
+    summary[[col + "_norm" for col in cols]] = norm
+    summary["adaptive_score"] = norm.mean(axis=1)
+
+    # --- Top 10 sectors (partial select, reversed so the largest bar plots on top) ---
+    top_approvals = summary.nlargest(10, "Total_Approvals").iloc[::-1]
+    top_adapt = summary.nlargest(10, "adaptive_score").iloc[::-1]
+    return summary, top_approvals, top_adapt
+
+# --- Tab 1 tables: precomputed by prepare.py, aggregated here if missing ---
+YEARLY_PATH = "data/yearly.parquet"
+TOP_EMP_PATH = "data/top_emp.parquet"
+
+@st.cache_data(hash_funcs=FRAME_BY_ID)
+def source_stamp(df):
+    """Row count and total approvals: what prepare.py stamps on each summary table."""
+    return {"source_rows": len(df), "source_approvals": int(df["Total_Approvals"].sum())}
+
 @st.cache_data
-def load_data():
-    return pd.read_csv("data/clean_h1b_data.csv")
+def read_summary(signature):
+    """Small summary table written by prepare.py (keyed on its file signature)."""
+    return pd.read_parquet(signature[0][0], engine="pyarrow")
+
+def current_summary(path, df):
+    """The precomputed table at path, or None if it is missing or stamped for other data."""
+    if not os.path.exists(path):
+        return None
+    # Checked by content, not mtime: git checkouts don't preserve file times
+    table = read_summary(file_signature(path))
+    return table if table.attrs == source_stamp(df) else None
+
+def yearly_table(df):
+    """Per-year totals for Tab 1, from the precomputed file when it matches the data."""
+    table = current_summary(YEARLY_PATH, df)
+    return table if table is not None else year_summary(df)
+
+def top_employer_table(df):
+    """Top-10 employers for Tab 1, from the precomputed file when it matches the data."""
+    table = current_summary(TOP_EMP_PATH, df)
+    return table if table is not None else top_employers(df)
+
+# --- Tab 2 simulation (keyed by the slider values) ---
+BASELINE_FEE = 25_000
+ELASTICITY_GAP = 0.15
+FEE_STEPS = range(5_000, 100_001, 5_000)
+ELASTICITY_STEPS = np.round(np.arange(-1.0, 0.0001, 0.05), 2)
+
+def split_elasticity(elasticity):
+    """Spread the average elasticity into (less flexible, more flexible) values."""
+    return max(-1.0, elasticity - ELASTICITY_GAP), min(0.0, elasticity + ELASTICITY_GAP)
+
+@st.cache_resource
+def sim_grid(_df):
+    """Precomputed simulation for every (fee, elasticity) slider position."""
+    # Keyed on the data file, simulation.py and app.py (grid constants, split_elasticity)
+    # so an edit to any of them rebuilds the persisted grid
+    return build_sim_grid(
+        _df, file_signature(data_path(), simulate_fee_change.__code__.co_filename, __file__)
+    )
+
+@st.cache_data(persist="disk", max_entries=1, show_spinner=False)
+def build_sim_grid(_df, signature):
+    """Run the simulation for every slider position (persisted across restarts)."""
+    # The model is linear in Total_Applications, so one row per
+    # (Year, Flexibility_Index) gives the same group sums as the full frame
+    reduced = _df.groupby(["Year", "Flexibility_Index"], as_index=False)[["Total_Applications"]].sum()
+    keys = [(fee_usd, float(elasticity)) for fee_usd in FEE_STEPS for elasticity in ELASTICITY_STEPS]
+
+    def run(key):
+        fee_usd, elasticity = key
+        elasticity_low, elasticity_high = split_elasticity(elasticity)
+        return simulate_fee_change(
+            reduced,
+            alpha=(fee_usd - BASELINE_FEE) / BASELINE_FEE,
+            elasticity_low=elasticity_low,
+            elasticity_high=elasticity_high,
+            verbose=False
+        )
+
+    # Grid points are independent; evaluate them on a thread pool
+    with ThreadPoolExecutor() as pool:
+        return dict(zip(keys, pool.map(run, keys)))
+
+@st.cache_data(max_entries=64)
+def run_simulation(_df, alpha, elasticity_low, elasticity_high):
+    """Slider-keyed simulation; the loaded frame is skipped when hashing the key."""
+    return simulate_fee_change(
+        _df,
+        alpha=alpha,
+        elasticity_low=elasticity_low,
+        elasticity_high=elasticity_high
+    )
+
+# --- Tab 2 text: static narrative lives here, the fragment only fills in the numbers ---
+PARAMETER_SUMMARY_MD = """
+<div style="display:flex; gap:1rem; font-family:Georgia; color:#2b2b2b; font-size:16px;">
+    <div style="flex:1;">
+        <b>Policy Inputs</b><br>
+        <ul style="margin-top:5px; line-height:1.6;">
+            <li><b>Baseline Fee:</b> ${baseline_fee:,.0f}</li>
+            <li><b>New Fee:</b> ${fee_usd:,.0f}</li>
+            <li><b>Fee Change (α):</b> {alpha_pct:.1f}%</li>
+        </ul>
+    </div>
+    <div style="flex:1;">
+        <b>Elasticity (ε)</b><br>
+        <ul style="margin-top:5px; line-height:1.6;">
+            <li><b>Less Flexible:</b> {low:.2f}</li>
+            <li><b>More Flexible:</b> {high:.2f}</li>
+        </ul>
+    </div>
+</div>
+<hr style='margin-top:0px; margin-bottom:20px;'>
+"""
+
+PROJECTED_RANGE_MD = """
+<div style="text-align:center; font-family:Georgia; color:#2b2b2b; margin-top:-25px;">
+    <div style="font-size:16px; font-weight:bold; margin-bottom:2px;">
+        Projected Change Range (Δ Applications, %)
+    </div>
+    <div style="font-size:28px; font-weight:bold; color:#c4452f; margin-top:-8px; margin-bottom:6px;">
+        {high:.1f}% to {low:.1f}%
+    </div>
+    <div style="font-size:14px; color:#555; margin-top:-2px; margin-bottom:18px;">
+        Expected reduction in applications from more vs. less flexible employers
+    </div>
+</div>
+
+The simulation indicates that the decline in H-1B applications resulting from fee increases varies systematically across employers.
+Firms characterized by higher flexibility show a significantly smaller reduction in application volume, suggesting that adaptive capacity enables them to absorb policy-induced cost pressures more effectively.
+This pattern reveals a structural asymmetry in the labor market response: while less flexible employers retract sharply in the face of rising costs, more adaptable organizations maintain a steadier level of engagement.
+Such heterogeneity underscores the importance of organizational adaptability as a moderating factor in policy transmission and highlights how fee-based interventions can have uneven effects across employer types.
+
+<br>
+"""
+
+KEY_FINDINGS_MD = """
+### Key Findings
+- Raising the H-1B sponsorship cost to **USD {fee_usd:,}** (~{alpha_pct:.0f}% above baseline) leads to an estimated reduction in applications of **{high:.1f}% to {low:.1f}%**, depending on employer flexibility.  
+- The distributional pattern of these adjustments indicates that sectors with **diversified visa portfolios**—notably **Finance** and **Technology**—are better positioned to sustain talent flows under cost escalation.  
+- Conversely, sectors characterized by **structural dependence on the H-1B channel**, such as **Consulting**, face steeper contraction risks and limited substitutability.  
+- These dynamics illustrate that adaptability, rather than scale, serves as the key determinant of resilience in the post-study employment ecosystem.
+"""
+
+# --- Tab 3 impact bands (|projected change| < 10%, < 40%, else) ---
+IMPACT_TONES = [
+    ("a mild and manageable adjustment in employer demand", "modest"),
+    ("a noticeable contraction, particularly among smaller or less flexible employers", "moderate"),
+    ("a severe contraction that could reshape sponsorship patterns", "strong"),
+]
+
+def impact_band(projected_change):
+    """Index into IMPACT_TONES for a scalar or an array of projected changes (%)."""
+    magnitude = np.abs(projected_change)
+    return np.select([magnitude < 10, magnitude < 40], [0, 1], default=2)
+
+# ==============================================================
+# CACHED FIGURES (rebuilt only when their input data changes)
+# ==============================================================
+# Plotly modules are imported inside each builder: they are only needed on a cache
+# miss, after the intro renders. Every chart is built from graph_objects traces fed
+# NumPy arrays (no plotly.express frame introspection, and its slow import is
+# skipped). Line charts use go.Scattergl (one WebGL canvas, no per-point SVG nodes).
+# cache_resource hands back the same Figure object (no unpickled copy per rerun);
+# st.plotly_chart only serializes it, so sharing across sessions is safe.
+@st.cache_resource
+def build_fig1(yearly):
+    """Approvals/denials trend line chart with end-of-line labels."""
+    import plotly.graph_objects as go
+
+    line_colors = {"Total_Approvals": "#4DB6AC", "Total_Denials": "#FF6F61"}
+    fig1 = go.Figure([
+        go.Scattergl(
+            x=yearly["Year"].to_numpy(),
+            y=yearly[col].to_numpy(),
+            name=col,
+            mode="lines+markers",
+            line=dict(color=color),
+            hovertemplate=f"variable={col}<br>Year=%{{x}}<br>value=%{{y}}<extra></extra>",
+        )
+        for col, color in line_colors.items()
+    ])
+
+    # --- Base styling ---
+    fig1.update_layout(
+        showlegend=False,  # ✅ remove legend
+        template="simple_white",
+        font=dict(family="Georgia", color="#2b2b2b"),
+        xaxis_title=None,
+        yaxis_title=None,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        margin=dict(t=40, b=40, l=30, r=30),
+    )
+
+    # --- Remove y-axis line ---
+    fig1.update_yaxes(showline=False, showgrid=True, gridcolor="rgba(0,0,0,0.05)")
+    fig1.update_xaxes(showline=False, showgrid=True, gridcolor="rgba(0,0,0,0.05)")
+
+    # --- Add text labels at end of lines (one layout update, no per-trace loop) ---
+    last_x = yearly["Year"].iat[-1]
+    fig1.update_layout(annotations=[
+        dict(
+            x=last_x + 0.1,  # a little to the right of last point
+            y=yearly[col].iat[-1],
+            text=f"<b>{col.replace('_', ' ')}</b>",
+            font=dict(family="Georgia", size=14, color=color),
+            showarrow=False,
+            xanchor="left",
+            yanchor="middle"
+        )
+        for col, color in line_colors.items()
+    ])
+
+    return fig1
+
+@st.cache_resource
+def build_fig2(top_emp):
+    """Horizontal bar chart of the top sponsoring employers."""
+    import plotly.graph_objects as go
+
+    # --- Horizontal bar chart ---
+    fig2 = go.Figure(go.Bar(
+        x=top_emp["Total_Approvals"].to_numpy(),
+        y=top_emp["Employer"].to_numpy(),
+        orientation="h",
+        marker_color="#457b9d",
+        texttemplate="%{x:.1s}",
+        hovertemplate="Total_Approvals=%{x}<br>Employer=%{y}<extra></extra>",
+    ))
+
+    # --- Clean visual design ---
+    fig2.update_layout(
+        template="simple_white",
+        font=dict(family="Georgia", color="#2b2b2b"),
+        showlegend=False,
+        yaxis=dict(
+            title=None,
+            showgrid=False,
+            showline=False,
+            tickfont=dict(size=13),
+        ),
+        xaxis=dict(
+            title=None,
+            showgrid=True,
+            gridcolor="rgba(0,0,0,0.05)",
+            showline=False,
+            zeroline=False,
+            tickfont=dict(size=12),
+        ),
+        margin=dict(t=20, b=20, l=0, r=30),
+        height=520,
+    )
+
+    fig2.update_traces(
+        textfont=dict(family="Georgia", size=13, color="white"),
+        textposition="inside",
+        cliponaxis=False,
+    )
+
+    return fig2
+
+# Static styling for fig_sim, built once: each slider setting only fills in the
+# two traces' x/y arrays instead of re-validating the whole layout
+FLEX_GROUPS = ["Less Flexible", "More Flexible"]
+
+@st.cache_resource
+def sim_figure_base():
+    """Styled, empty grouped bar chart with one trace per flexibility group."""
+    import plotly.graph_objects as go
+
+    custom_palette = ["#c4452f", "#6b705c"]
+
+    # --- Bar chart (one trace per flexibility group) ---
+    fig_sim = go.Figure([
+        go.Bar(
+            name=flex_group,
+            marker_color=color,
+            showlegend=True,
+            hovertemplate=(
+                f"Employer Flexibility={flex_group}<br>Year=%{{x}}<br>Change (%)=%{{y}}<extra></extra>"
+            ),
+        )
+        for flex_group, color in zip(FLEX_GROUPS, custom_palette)
+    ])
+
+    fig_sim.update_layout(
+        barmode="group",
+        template="simple_white",
+        font=dict(family="Georgia", color="#2b2b2b"),
+        xaxis_title="",
+        yaxis_title=None,
+        legend_title_text="",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            bgcolor="rgba(0,0,0,0)",
+            bordercolor="rgba(0,0,0,0)"
+        ),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        bargap=0.25,
+        margin=dict(t=40, b=60, l=30, r=30),
+    )
+
+    fig_sim.update_yaxes(visible=False, showticklabels=False, showgrid=False, zeroline=False)
+    fig_sim.update_xaxes(showgrid=False, linecolor="rgba(0,0,0,0.3)", tickfont=dict(size=14))
+    fig_sim.update_traces(
+        texttemplate="%{text}",
+        textposition="outside",
+        textfont=dict(family="Georgia", size=14, color="#2b2b2b"),
+        cliponaxis=False
+    )
+
+    return fig_sim
+
+@st.cache_resource
+def build_fig_sim(sim):
+    """Grouped bar chart of simulated change by flexibility group."""
+    import plotly.graph_objects as go
+
+    # --- Copy the styled base and fill in only the per-group data arrays ---
+    fig_sim = go.Figure(sim_figure_base())
+    groups = sim["Flex_Group"].to_numpy()
+    with fig_sim.batch_update():
+        for trace in fig_sim.data:
+            mask = groups == trace.name
+            change = sim["Change_%"].to_numpy()[mask]
+            trace.x = sim["Year"].to_numpy()[mask]
+            trace.y = change
+            trace.text = [f"{value:.1f}%" for value in change]
+
+    return fig_sim
+
+@st.cache_resource
+def build_fig_approvals(top_approvals):
+    """Horizontal bar chart of sectors by total approvals."""
+    import plotly.graph_objects as go
+
+    color_approvals = "#4DB6AC"  # teal
+
+    # Calculate a threshold for "short" bars (10% of the max value)
+    threshold_approvals = top_approvals["Total_Approvals"].max() * 0.1
+
+    # Create dynamic position list
+    positions_approvals = np.where(
+        top_approvals["Total_Approvals"].to_numpy() > threshold_approvals, "inside", "outside"
+    ).tolist()
+
+    fig_approvals = go.Figure(go.Bar(
+        x=top_approvals["Total_Approvals"].to_numpy(),
+        y=top_approvals["Sector"].to_numpy(),
+        orientation="h",
+        marker_color=color_approvals,
+        text=[f"{value:,.0f}" for value in top_approvals["Total_Approvals"]],
+        texttemplate="%{text}",
+        textposition=positions_approvals,
+        marker_line_color="#2b2b2b",
+        marker_line_width=0.8,
+        hovertemplate="Total Approvals=%{x}<br>=%{y}<extra></extra>",
+    ))
+    fig_approvals.update_layout(
+        title_text="<b>Top Sectors by H-1B Approvals</b>",
+        title=dict(x=0.5, xanchor="center", yanchor="top"),
+        template="simple_white",
+        font=dict(family="Georgia", color="#2b2b2b"),
+        yaxis=dict(title="", showgrid=False, showticklabels=True),
+        xaxis=dict(title="", showgrid=True, gridcolor="rgba(0,0,0,0.05)", visible=False),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        margin=dict(t=70, b=60, l=20, r=40),
+    )
+
+    return fig_approvals
+
+@st.cache_resource
+def build_fig_adaptive(top_adapt):
+    """Horizontal bar chart of sectors by adaptive score."""
+    import plotly.graph_objects as go
+
+    color_adaptive = "#E4A672"   # warm tan
+
+    # Calculate a threshold for "short" bars (10% of the max value)
+    threshold_adaptive = top_adapt["adaptive_score"].max() * 0.1
+
+    # Create dynamic position list
+    positions_adaptive = np.where(
+        top_adapt["adaptive_score"].to_numpy() > threshold_adaptive, "inside", "outside"
+    ).tolist()
+
+    fig_adaptive = go.Figure(go.Bar(
+        x=top_adapt["adaptive_score"].to_numpy(),
+        y=top_adapt["Sector"].to_numpy(),
+        orientation="h",
+        marker_color=color_adaptive,
+        text=[f"{value:.2f}" for value in top_adapt["adaptive_score"]],
+        texttemplate="%{text}",
+        textposition=positions_adaptive,
+        textfont=dict(family="Georgia", size=14, color="#2b2b2b"),
+        marker_line_color="#2b2b2b",
+        marker_line_width=0.8,
+        cliponaxis=False,
+        hovertemplate="Adaptive Score=%{x}<br>=%{y}<extra></extra>",
+    ))
+
+    fig_adaptive.update_layout(
+        title_text="<b>Top Sectors by Adaptive Score</b>",
+        title=dict(x=0.5, xanchor="center", yanchor="top"),
+        template="simple_white",
+        font=dict(family="Georgia", color="#2b2b2b"),
+        yaxis=dict(title="", showgrid=False, showticklabels=True),
+        xaxis=dict(title="", showgrid=True, gridcolor="rgba(0,0,0,0.05)", visible=False),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        margin=dict(t=70, b=60, l=20, r=120),
+    )
+
+    return fig_adaptive
 
 df = load_data()
 
@@ -42,6 +542,9 @@ Recent policy discussions have introduced proposals to raise the **H-1B filing f
 To assess these potential impacts, this study integrates official **USCIS H-1B DataHub (2015–2023)** records with curated datasets of **OPT** and **CPT-friendly employers**. The resulting analysis provides an empirical foundation for examining how the U.S. post-study employment ecosystem might adapt under a significant cost escalation. By combining descriptive data exploration, elasticity modeling, and sector-level adaptability analysis, the research seeks to quantify not only the magnitude of the potential response but also its distribution across industries most reliant on global talent.
 """)
 
+# Read-only reference bar charts: render as static images (no hover/zoom handlers or modebar)
+STATIC_CHART = {"staticPlot": True, "displayModeBar": False}
+
 tab1, tab2, tab3 = st.tabs(
     ["1️⃣ Data & Findings", "2️⃣ Simulation & Results", "3️⃣ Policy Discussion & Conclusion"]
 )
@@ -89,48 +592,9 @@ with tab1:
     </div>
     """, unsafe_allow_html=True)
 
-    yearly = df.groupby("Year")[["Total_Approvals", "Total_Denials"]].sum().reset_index()
-
-    fig1 = px.line(
-        yearly,
-        x="Year",
-        y=["Total_Approvals", "Total_Denials"],
-        markers=True,
-        color_discrete_map={"Total_Approvals": "#4DB6AC", "Total_Denials": "#FF6F61"},
-    )
-
-    # --- Base styling ---
-    fig1.update_layout(
-        showlegend=False,  # ✅ remove legend
-        template="simple_white",
-        font=dict(family="Georgia", color="#2b2b2b"),
-        xaxis_title=None,
-        yaxis_title=None,
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        margin=dict(t=40, b=40, l=30, r=30),
-    )
-
-    # --- Remove y-axis line ---
-    fig1.update_yaxes(showline=False, showgrid=True, gridcolor="rgba(0,0,0,0.05)")
-    fig1.update_xaxes(showline=False, showgrid=True, gridcolor="rgba(0,0,0,0.05)")
-
-    # --- Add text labels at end of lines ---
-    for trace in fig1.data:
-        last_x = yearly["Year"].iloc[-1]
-        last_y = trace.y[-1]
-        trace_name = trace.name.replace("_", " ")
-        fig1.add_annotation(
-            x=last_x + 0.1,  # a little to the right of last point
-            y=last_y,
-            text=f"<b>{trace_name}</b>",
-            font=dict(family="Georgia", size=14, color=trace.line.color),
-            showarrow=False,
-            xanchor="left",
-            yanchor="middle"
-        )
+    yearly = yearly_table(df)[["Year", "Total_Approvals", "Total_Denials"]]
 
-    st.plotly_chart(fig1, use_container_width=True)
+    st.plotly_chart(build_fig1(yearly), use_container_width=True)
 
     st.markdown("""
     The historical trend of H-1B approvals and denials underscores a fundamental insight: **employer reliance on foreign skilled labor is deeply structural rather than cyclical**. Even across years marked by shifting policy enforcement, the sustained volume of applications reveals an **inelastic demand** for global talent. Periods of heightened scrutiny produced temporary fluctuations in denials, yet total participation remained resilient—signaling that the H-1B program has become a **core institutional mechanism** within the U.S. innovation economy. This persistent baseline defines the counterfactual against which the subsequent fee-shock simulation measures potential behavioral change.
@@ -151,55 +615,8 @@ with tab1:
     </div>
     """, unsafe_allow_html=True)
 
-    # --- Data ---
-    top_emp = (
-        df.groupby("Employer")[["Total_Approvals"]]
-        .sum()
-        .nlargest(10, "Total_Approvals")
-        .reset_index()
-    )
-
-    # Sort descending (largest on top)
-    top_emp = top_emp.sort_values("Total_Approvals", ascending=True)
-
-    # --- Horizontal bar chart ---
-    fig2 = px.bar(
-        top_emp,
-        y="Employer",
-        x="Total_Approvals",
-        text_auto=".1s",
-        orientation="h",
-        color_discrete_sequence=["#457b9d"],
-    )
-
-    # --- Clean visual design ---
-    fig2.update_layout(
-        template="simple_white",
-        font=dict(family="Georgia", color="#2b2b2b"),
-        showlegend=False,
-        yaxis=dict(
-            title=None,
-            showgrid=False,
-            showline=False,
-            tickfont=dict(size=13),
-        ),
-        xaxis=dict(
-            title=None,
-            showgrid=True,
-            gridcolor="rgba(0,0,0,0.05)",
-            showline=False,
-            zeroline=False,
-            tickfont=dict(size=12),
-        ),
-        margin=dict(t=20, b=20, l=0, r=30),
-        height=520,
-    )
-
-    fig2.update_traces(
-        textfont=dict(family="Georgia", size=13, color="white"),
-        textposition="inside",
-        cliponaxis=False,
-    )
+    # --- Data (sorted so the largest employer is on top) ---
+    top_emp = top_employer_table(df)
 
     # --- Two-column layout (balanced height) ---
     col1, col2 = st.columns([1, 1.3])
@@ -224,7 +641,7 @@ with tab1:
         """, unsafe_allow_html=True)
 
     with col2:
-        st.plotly_chart(fig2, use_container_width=True)
+        st.plotly_chart(build_fig2(top_emp), use_container_width=True, config=STATIC_CHART)
 
     # # --- Chart 3: Employer participation across pathways ---
     # st.subheader("Employer Participation Across Pathways")
@@ -255,12 +672,14 @@ with tab1:
 # ==============================================================
 # TAB 2 – SIMULATION & SECTOR RESULTS
 # ==============================================================
-with tab2:
+@st.fragment
+def simulation_panel():
+    """Tab 2 sliders and simulation; slider moves rerun only this fragment."""
     # --- Dynamic title ---
     title_placeholder = st.empty()
 
     # --- Baseline setup ---
-    baseline_fee = 25_000
+    baseline_fee = BASELINE_FEE
 
     # --- User inputs ---
     st.markdown("""
@@ -296,64 +715,40 @@ with tab2:
     )
 
     # --- Automatically create heterogeneity ---
-    elasticity_gap = 0.15
-    elasticity_low = max(-1.0, elasticity - elasticity_gap)
-    elasticity_high = min(0.0, elasticity + elasticity_gap)
+    elasticity_low, elasticity_high = split_elasticity(elasticity)
 
     # --- Compute proportional fee change ---
     alpha = (fee_usd - baseline_fee) / baseline_fee
 
-    # --- Run simulation with heterogeneous elasticity ---
-    sim = simulate_fee_change(
-        df,
-        alpha=alpha,
-        elasticity_low=elasticity_low,
-        elasticity_high=elasticity_high
-    )
+    # --- Look up the precomputed simulation (run it only off-grid) ---
+    sim = sim_grid(df).get((fee_usd, round(elasticity, 2)))
+    if sim is None:
+        sim = run_simulation(
+            df,
+            alpha=alpha,
+            elasticity_low=elasticity_low,
+            elasticity_high=elasticity_high
+        )
 
     # --- Projected changes ---
     projected_change_low = elasticity_low * alpha * 100
     projected_change_high = elasticity_high * alpha * 100
 
-    # TWO-COLUMN PARAMETER SUMMARY
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown(
-            f"""
-            <div style="font-family:Georgia; color:#2b2b2b; font-size:16px;">
-                <b>Policy Inputs</b><br>
-                <ul style="margin-top:5px; line-height:1.6;">
-                    <li><b>Baseline Fee:</b> ${baseline_fee:,.0f}</li>
-                    <li><b>New Fee:</b> ${fee_usd:,.0f}</li>
-                    <li><b>Fee Change (α):</b> {alpha*100:.1f}%</li>
-                </ul>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+    # TWO-COLUMN PARAMETER SUMMARY (one flex row + rule: a single markdown element)
 
-    with col2:
-        st.markdown(
-            f"""
-            <div style="font-family:Georgia; color:#2b2b2b; font-size:16px;">
-                <b>Elasticity (ε)</b><br>
-                <ul style="margin-top:5px; line-height:1.6;">
-                    <li><b>Less Flexible:</b> {elasticity_low:.2f}</li>
-                    <li><b>More Flexible:</b> {elasticity_high:.2f}</li>
-                </ul>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-
-    st.markdown("<hr style='margin-top:0px; margin-bottom:20px;'>", unsafe_allow_html=True)
+    st.markdown(
+        PARAMETER_SUMMARY_MD.format(
+            baseline_fee=baseline_fee,
+            fee_usd=fee_usd,
+            alpha_pct=alpha * 100,
+            low=elasticity_low,
+            high=elasticity_high,
+        ),
+        unsafe_allow_html=True
+    )
 
     # VISUALIZATION
 
-    custom_palette = ["#c4452f", "#6b705c"]
-
     if "Year" in sim.columns and "Flex_Group" in sim.columns:
         
         st.markdown("""
@@ -367,80 +762,31 @@ with tab2:
         </div>
         """, unsafe_allow_html=True)
 
-        # --- Bar chart ---
-        fig_sim = px.bar(
-            sim,
-            x="Year",
-            y="Change_%",
-            color="Flex_Group",
-            barmode="group",
-            labels={
-                "Change_%": "Change (%)",
-                "Flex_Group": "Employer Flexibility",
-                "Year": "Year"
-            },
-            color_discrete_sequence=custom_palette,
-        )
-
-        fig_sim.update_layout(
-            template="simple_white",
-            font=dict(family="Georgia", color="#2b2b2b"),
-            xaxis_title="",
-            yaxis_title=None,
-            legend_title_text="",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5,
-                bgcolor="rgba(0,0,0,0)",
-                bordercolor="rgba(0,0,0,0)"
-            ),
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            bargap=0.25,
-            margin=dict(t=40, b=60, l=30, r=30),
-        )
+        # --- Bar chart (stable key: the browser updates the same plot in place) ---
+        st.plotly_chart(build_fig_sim(sim), use_container_width=True, key="sim_chart")
 
-        fig_sim.update_yaxes(visible=False, showticklabels=False, showgrid=False, zeroline=False)
-        fig_sim.update_xaxes(showgrid=False, linecolor="rgba(0,0,0,0.3)", tickfont=dict(size=14))
-        fig_sim.update_traces(
-            texttemplate="%{y:.1f}%",
-            textposition="outside",
-            textfont=dict(family="Georgia", size=14, color="#2b2b2b"),
-            cliponaxis=False
-        )
-
-        st.plotly_chart(fig_sim, use_container_width=True)
-
-        # --- Projected range summary ---
+        # --- Projected range summary + narrative (one markdown element) ---
         st.markdown(
-            f"""
-            <div style="text-align:center; font-family:Georgia; color:#2b2b2b; margin-top:-25px;">
-                <div style="font-size:16px; font-weight:bold; margin-bottom:2px;">
-                    Projected Change Range (Δ Applications, %)
-                </div>
-                <div style="font-size:28px; font-weight:bold; color:#c4452f; margin-top:-8px; margin-bottom:6px;">
-                    {projected_change_high:.1f}% to {projected_change_low:.1f}%
-                </div>
-                <div style="font-size:14px; color:#555; margin-top:-2px; margin-bottom:18px;">
-                    Expected reduction in applications from more vs. less flexible employers
-                </div>
-            </div>
-            """,
+            PROJECTED_RANGE_MD.format(high=projected_change_high, low=projected_change_low),
             unsafe_allow_html=True
         )
 
-        st.markdown("""
-        The simulation indicates that the decline in H-1B applications resulting from fee increases varies systematically across employers.
-        Firms characterized by higher flexibility show a significantly smaller reduction in application volume, suggesting that adaptive capacity enables them to absorb policy-induced cost pressures more effectively.
-        This pattern reveals a structural asymmetry in the labor market response: while less flexible employers retract sharply in the face of rising costs, more adaptable organizations maintain a steadier level of engagement.
-        Such heterogeneity underscores the importance of organizational adaptability as a moderating factor in policy transmission and highlights how fee-based interventions can have uneven effects across employer types.
-        """)
-        st.markdown("<br>", unsafe_allow_html=True)
+    # --- Slider-dependent Key Findings (placeholder below the sector section) ---
+    key_findings_placeholder.markdown(KEY_FINDINGS_MD.format(
+        fee_usd=fee_usd,
+        alpha_pct=alpha * 100,
+        high=abs(projected_change_high),
+        low=abs(projected_change_low),
+    ))
 
-    # SECTOR ANALYSIS
+    # --- Keep the Tab 3 discussion in sync with the sliders ---
+    render_policy_discussion(fee_usd, elasticity)
+
+with tab2:
+    # --- Sliders and simulation (filled by the fragment at the end of the script) ---
+    simulation_slot = st.container()
+
+    # SECTOR ANALYSIS (static: outside the fragment, so slider moves skip it)
 
     st.markdown("""
     <div style="text-align:center; font-family:Georgia; color:#2b2b2b;">
@@ -456,130 +802,18 @@ with tab2:
     </div>
     """, unsafe_allow_html=True)
 
-    # --- Sector mapping ---
-    df["NAICS2"] = (df["NAICS"].astype(str).str[:2]).astype(int)
-    naics_map = {
-        51: "Technology (Information)",
-        52: "Finance/Insurance",
-        54: "Professional/Consulting",
-        55: "Management of Companies",
-        61: "Education",
-        62: "Healthcare/Social Assistance",
-        31: "Manufacturing",
-        32: "Manufacturing",
-        33: "Manufacturing",
-    }
-    df["Sector"] = df["NAICS2"].map(naics_map).fillna("Other")
-
-    # --- Aggregate and normalize ---
-    sector_summary = (
-        df.groupby("Sector")
-        .agg(
-            Total_Approvals=("Total_Approvals", "sum"),
-            mean_flex=("Flexibility_Index", "mean"),
-            share_opt=("OPT_friendly", "mean"),
-            share_cpt=("CPT_friendly", "mean"),
-            share_f500=("Fortune500", "mean"),
-        )
-        .reset_index()
-    )
-
-    for col in ["mean_flex", "share_opt", "share_cpt", "share_f500"]:
-        denom = (sector_summary[col].max() - sector_summary[col].min()) or 1e-9
-        sector_summary[col + "_norm"] = (sector_summary[col] - sector_summary[col].min()) / denom
-
-    sector_summary["adaptive_score"] = sector_summary[
-        ["mean_flex_norm", "share_opt_norm", "share_cpt_norm", "share_f500_norm"]
-    ].mean(axis=1)
-
-    # --- Top 10 sectors ---
-    top_approvals = sector_summary.sort_values("Total_Approvals", ascending=True).tail(10)
-    top_adapt = sector_summary.sort_values("adaptive_score", ascending=True).tail(10)
-
-    # --- Theme colors ---
-    color_approvals = "#4DB6AC"  # teal
-    color_adaptive = "#E4A672"   # warm tan
+    # --- Aggregate, normalize, and select top 10 sectors (cached) ---
+    _, top_approvals, top_adapt = sector_summary(df)
 
     # --- CLEAN HORIZONTAL BAR VISUALIZATION ---
 
     col1, col2 = st.columns(2)
 
-    # Calculate a threshold for "short" bars (10% of the max value)
-    threshold_approvals = top_approvals["Total_Approvals"].max() * 0.1
-    threshold_adaptive = top_adapt["adaptive_score"].max() * 0.1
-
-    # Create dynamic position lists
-    positions_approvals = [
-        "inside" if x > threshold_approvals else "outside"
-        for x in top_approvals["Total_Approvals"]
-    ]
-
-    positions_adaptive = [
-        "inside" if x > threshold_adaptive else "outside"
-        for x in top_adapt["adaptive_score"]
-    ]
-
     with col1:
-        fig_approvals = px.bar(
-            top_approvals,
-            y="Sector",
-            x="Total_Approvals",
-            text="Total_Approvals",
-            orientation="h",
-            color_discrete_sequence=[color_approvals],
-            labels={"Total_Approvals": "Total Approvals", "Sector": ""},
-            title="<b>Top Sectors by H-1B Approvals</b>",
-        )
-        fig_approvals.update_traces(
-            texttemplate="%{x:,.0f}",
-            textposition=positions_approvals,
-            marker_line_color="#2b2b2b",
-            marker_line_width=0.8,
-        )
-        fig_approvals.update_layout(
-            title=dict(x=0.5, xanchor="center", yanchor="top"),
-            template="simple_white",
-            font=dict(family="Georgia", color="#2b2b2b"),
-            yaxis=dict(title="", showgrid=False, showticklabels=True),
-            xaxis=dict(title="", showgrid=True, gridcolor="rgba(0,0,0,0.05)", visible=False),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            margin=dict(t=70, b=60, l=20, r=40),
-        )
-        st.plotly_chart(fig_approvals, use_container_width=True)
+        st.plotly_chart(build_fig_approvals(top_approvals), use_container_width=True, config=STATIC_CHART, key="sector_approvals_chart")
 
     with col2:
-        fig_adaptive = px.bar(
-            top_adapt,
-            y="Sector",
-            x="adaptive_score",
-            text="adaptive_score",
-            orientation="h",
-            color_discrete_sequence=[color_adaptive],
-            labels={"adaptive_score": "Adaptive Score", "Sector": ""},
-            title="<b>Top Sectors by Adaptive Score</b>",
-        )
-
-        fig_adaptive.update_traces(
-            texttemplate="%{x:.2f}",
-            textposition=positions_adaptive,
-            textfont=dict(family="Georgia", size=14, color="#2b2b2b"),
-            marker_line_color="#2b2b2b",
-            marker_line_width=0.8,
-            cliponaxis=False,
-        )
-
-        fig_adaptive.update_layout(
-            title=dict(x=0.5, xanchor="center", yanchor="top"),
-            template="simple_white",
-            font=dict(family="Georgia", color="#2b2b2b"),
-            yaxis=dict(title="", showgrid=False, showticklabels=True),
-            xaxis=dict(title="", showgrid=True, gridcolor="rgba(0,0,0,0.05)", visible=False),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            margin=dict(t=70, b=60, l=20, r=120),
-        )
-        st.plotly_chart(fig_adaptive, use_container_width=True)
+        st.plotly_chart(build_fig_adaptive(top_adapt), use_container_width=True, config=STATIC_CHART, key="sector_adaptive_chart")
 
     st.markdown(
         """
@@ -594,16 +828,7 @@ with tab2:
         unsafe_allow_html=True
     )
 
-    st.markdown(f"""
-    ### Key Findings
-    - Raising the H-1B sponsorship cost to **USD {fee_usd:,}** (~{alpha*100:.0f}% above baseline) leads to an estimated reduction in applications of **{abs(projected_change_high):.1f}% to {abs(projected_change_low):.1f}%**, depending on employer flexibility.  
-    - The distributional pattern of these adjustments indicates that sectors with **diversified visa portfolios**—notably **Finance** and **Technology**—are better positioned to sustain talent flows under cost escalation.  
-    - Conversely, sectors characterized by **structural dependence on the H-1B channel**, such as **Consulting**, face steeper contraction risks and limited substitutability.  
-    - These dynamics illustrate that adaptability, rather than scale, serves as the key determinant of resilience in the post-study employment ecosystem.
-    """)
-
-    st.session_state.fee_usd = fee_usd
-    st.session_state.elasticity = elasticity
+    key_findings_placeholder = st.empty()
 
 # ==============================================================
 # TAB 3 – POLICY DISCUSSION & CONCLUSION
@@ -611,38 +836,8 @@ with tab2:
 with tab3:
     st.header("Policy Discussion and Conclusion")
 
-    baseline_fee = 25_000
-    fee_usd = st.session_state.get("fee_usd", 25_000)
-    elasticity = st.session_state.get("elasticity", -0.3)
-    alpha = (fee_usd - baseline_fee) / baseline_fee
-    projected_change = elasticity * alpha * 100
-
-    if abs(projected_change) < 10:
-        tone = "a mild and manageable adjustment in employer demand"
-        effect = "modest"
-    elif abs(projected_change) < 40:
-        tone = "a noticeable contraction, particularly among smaller or less flexible employers"
-        effect = "moderate"
-    else:
-        tone = "a severe contraction that could reshape sponsorship patterns"
-        effect = "strong"
-
-    st.markdown(f"""
-    ### Policy Interpretation
-
-    The simulation results suggest that increasing the total H-1B sponsorship cost to **USD {fee_usd:,}**
-    (approximately **{alpha*100:.0f}%** above the current baseline) would result in an estimated
-    **{abs(projected_change):.1f}%** reduction in overall H-1B applications, assuming an elasticity of **{elasticity}**.
-    This outcome represents {tone}, implying that employer responses to policy shocks are not uniform across the economy.
-    Rather, the degree of adjustment depends heavily on each sector’s flexibility and capacity to absorb increased costs.
-
-    The **Technology (Information)** and **Finance/Insurance** sectors exhibit the highest adaptability scores in the dataset,
-    suggesting that firms within these industries can more readily adjust to elevated sponsorship costs by reallocating workers
-    through alternative visa pathways such as **OPT** or **CPT**. In contrast, **Professional and Consulting** firms remain
-    the largest contributors to total H-1B petitions but demonstrate relatively lower adaptive capacity,
-    indicating greater vulnerability to sharp fee increases. These findings underscore the asymmetric impact of cost shocks
-    across industries, revealing that elevated fees are likely to **redirect skilled labor flows** rather than eliminate them entirely.
-    """)
+    # --- Slider-dependent sections (filled by the Tab 2 fragment) ---
+    interpretation_placeholder = st.empty()
 
     st.markdown("""
     ### Policy Implications and Recommendations
@@ -664,15 +859,7 @@ with tab3:
     would enhance evidence-based policy evaluation and future reform design.
     """)
 
-    st.markdown(f"""
-    ### Broader Implications
-
-    The combined evidence from elasticity modeling and sector-level adaptability points to **{effect} substitution dynamics**
-    within the post-study employment ecosystem. Rather than a collapse in foreign talent inflows, the results suggest
-    a reallocation process in which more adaptive sectors absorb displaced demand through alternative visa channels.
-    The three programs—H-1B, OPT, and CPT—thus function as **a single interdependent system**, where adaptability determines
-    both sectoral resilience and the aggregate capacity to sustain skilled labor supply under policy stress.
-    """)
+    broader_placeholder = st.empty()
 
     st.markdown("""
     ---
@@ -682,4 +869,52 @@ with tab3:
     whereas **Consulting** continues to dominate sponsorship volume but faces greater structural constraints.
     Policymakers should recognize that openness to international talent and the flexibility of post-study employment programs
     are complementary drivers of U.S. competitiveness.  
-    """)
\ No newline at end of file
+    """)
+
+# Cached per slider position (a few hundred), so each pair of paragraphs
+# (band lookup + formatting) is assembled once and reused on every revisit
+@st.cache_data(show_spinner=False)
+def policy_discussion_text(fee_usd, elasticity):
+    """(interpretation, broader implications) markdown for one slider position."""
+    alpha = (fee_usd - BASELINE_FEE) / BASELINE_FEE
+    projected_change = elasticity * alpha * 100
+
+    tone, effect = IMPACT_TONES[int(impact_band(projected_change))]
+
+    interpretation = f"""
+    ### Policy Interpretation
+
+    The simulation results suggest that increasing the total H-1B sponsorship cost to **USD {fee_usd:,}**
+    (approximately **{alpha*100:.0f}%** above the current baseline) would result in an estimated
+    **{abs(projected_change):.1f}%** reduction in overall H-1B applications, assuming an elasticity of **{elasticity}**.
+    This outcome represents {tone}, implying that employer responses to policy shocks are not uniform across the economy.
+    Rather, the degree of adjustment depends heavily on each sector’s flexibility and capacity to absorb increased costs.
+
+    The **Technology (Information)** and **Finance/Insurance** sectors exhibit the highest adaptability scores in the dataset,
+    suggesting that firms within these industries can more readily adjust to elevated sponsorship costs by reallocating workers
+    through alternative visa pathways such as **OPT** or **CPT**. In contrast, **Professional and Consulting** firms remain
+    the largest contributors to total H-1B petitions but demonstrate relatively lower adaptive capacity,
+    indicating greater vulnerability to sharp fee increases. These findings underscore the asymmetric impact of cost shocks
+    across industries, revealing that elevated fees are likely to **redirect skilled labor flows** rather than eliminate them entirely.
+    """
+
+    broader = f"""
+    ### Broader Implications
+
+    The combined evidence from elasticity modeling and sector-level adaptability points to **{effect} substitution dynamics**
+    within the post-study employment ecosystem. Rather than a collapse in foreign talent inflows, the results suggest
+    a reallocation process in which more adaptive sectors absorb displaced demand through alternative visa channels.
+    The three programs—H-1B, OPT, and CPT—thus function as **a single interdependent system**, where adaptability determines
+    both sectoral resilience and the aggregate capacity to sustain skilled labor supply under policy stress.
+    """
+    return interpretation, broader
+
+def render_policy_discussion(fee_usd, elasticity):
+    """Write the slider-dependent Tab 3 paragraphs into their placeholders."""
+    interpretation, broader = policy_discussion_text(fee_usd, elasticity)
+    interpretation_placeholder.markdown(interpretation)
+    broader_placeholder.markdown(broader)
+
+# Run the Tab 2 fragment last so the Key Findings and Tab 3 placeholders exist
+with simulation_slot:
+    simulation_panel()
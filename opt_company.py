@@ -1,5 +1,4 @@
 import os
-import time
 import pandas as pd
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -26,13 +25,11 @@ driver = webdriver.Chrome(options=options)
 driver.get(url)
 print("🔹 Page opened. Waiting for table to load...")
 
-# --- scroll to bottom to trigger lazy load ---
-for i in range(10):
-    driver.execute_script(f"window.scrollTo(0, {i*800});")
-    time.sleep(1)
+# --- scroll to bottom once to trigger lazy load (no fixed sleeps) ---
+driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
 try:
-    # Wait for the table element to be visible (not just present)
+    # Wait for the table element to be visible (not just present); returns as soon as it is
     WebDriverWait(driver, 60).until(
         EC.visibility_of_element_located((By.CSS_SELECTOR, "table.mrd-blog-table"))
     )
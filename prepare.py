@@ -1,8 +1,13 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 from glob import glob
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 # Optional scrapers (only used if local cache missing)
 try:
@@ -30,61 +35,82 @@ def detect_employer_column(df):
 # ----------------------------------------------------------------------
 # 2. Load and Clean H-1B Datasets
 # ----------------------------------------------------------------------
+def parse_counts(values):
+    """Parse a text count column ("1,234", blanks) to numbers; blanks and junk become 0."""
+    # Strip separators and stray characters with Arrow's regex kernel (one C++ pass,
+    # no per-cell Python call), then cast the cleaned text straight to int32 (per-employer
+    # counts are far below 2**31; half the bytes of int64 through concat and the totals)
+    cleaned = pc.replace_substring_regex(
+        pa.array(values, type=pa.string(), from_pandas=True), r"[^0-9.\-]", ""
+    )
+    try:
+        return pc.cast(pc.if_else(pc.equal(cleaned, ""), "0", cleaned), pa.int32()).fill_null(0).to_numpy()
+    except pa.ArrowInvalid:
+        # Decimals or stray signs: fall back to pandas' lenient parse
+        return pd.to_numeric(pd.Series(cleaned.to_pandas()).replace("", "0"), errors="coerce").fillna(0).to_numpy()
+
+
+# Count columns and the header spellings they appear under across DataHub years
+COUNT_COLUMN_ALIASES = {
+    "Initial_Approvals": ["Initial_Approval", "INITIAL_APPROVALS", "Initial Approvals"],
+    "Continuing_Approvals": ["Continuing_Approval", "CONTINUING_APPROVALS", "Continuing Approvals"],
+    "Initial_Denials": ["Initial_Denial", "INITIAL_DENIALS", "Initial Denials"],
+    "Continuing_Denials": ["Continuing_Denial", "CONTINUING_DENIALS", "Continuing Denials"],
+}
+
+
+def load_year_file(f):
+    """Load one yearly DataHub CSV, clean its count columns, and compute totals."""
+    year = int(os.path.basename(f).split("-")[-1].split(".")[0])
+    df = pd.read_csv(f, dtype=str)
+    df.columns = df.columns.str.strip().str.replace(" ", "_")
+
+    emp_col = detect_employer_column(df)
+    df.rename(columns={emp_col: "Employer"}, inplace=True)
+
+    # Smart matching for numeric columns with flexible naming
+    # (header names normalized once per file, not once per alias)
+    normalized = [(c.lower().replace("_", ""), c) for c in df.columns]
+    for target, aliases in COUNT_COLUMN_ALIASES.items():
+        found = None
+        for alt in aliases:
+            key = alt.lower().replace("_", "")
+            found = next((c for norm, c in normalized if key in norm), None)
+            if found:
+                break
+
+        if found:
+            df[target] = parse_counts(df[found].to_numpy())
+        else:
+            print(f"Warning: Column not found for {target} in {os.path.basename(f)}. Filled with zeros.")
+            df[target] = 0
+
+    # Compute totals on the raw arrays (no index alignment; applications reuse both sums)
+    approvals = df["Initial_Approvals"].to_numpy() + df["Continuing_Approvals"].to_numpy()
+    denials = df["Initial_Denials"].to_numpy() + df["Continuing_Denials"].to_numpy()
+    df["Total_Approvals"] = approvals
+    df["Total_Denials"] = denials
+    df["Total_Applications"] = approvals + denials
+    df["Year"] = year
+    return df
+
+
 def load_and_clean(data_dir="data"):
     """Load yearly H-1B CSV files, clean numeric fields, and compute totals."""
     all_files = sorted(glob(os.path.join(data_dir, "h1b_datahubexport-*.csv")))
     if not all_files:
         raise FileNotFoundError(f"No H-1B files found in {data_dir}/")
 
-    dfs = []
-    for f in all_files:
-        year = int(os.path.basename(f).split("-")[-1].split(".")[0])
-        df = pd.read_csv(f, dtype=str)
-        df.columns = df.columns.str.strip().str.replace(" ", "_")
-
-        emp_col = detect_employer_column(df)
-        df.rename(columns={emp_col: "Employer"}, inplace=True)
-
-        # Smart matching for numeric columns with flexible naming
-        name_map = {
-            "Initial_Approvals": ["Initial_Approval", "INITIAL_APPROVALS", "Initial Approvals"],
-            "Continuing_Approvals": ["Continuing_Approval", "CONTINUING_APPROVALS", "Continuing Approvals"],
-            "Initial_Denials": ["Initial_Denial", "INITIAL_DENIALS", "Initial Denials"],
-            "Continuing_Denials": ["Continuing_Denial", "CONTINUING_DENIALS", "Continuing Denials"],
-        }
-
-        for target, aliases in name_map.items():
-            found = None
-            for alt in aliases:
-                match = [c for c in df.columns if alt.lower().replace("_", "") in c.lower().replace("_", "")]
-                if match:
-                    found = match[0]
-                    break
-
-            if found:
-                cleaned = (
-                    df[found]
-                    .astype(str)
-                    .replace(r"[^0-9.\-]", "", regex=True)
-                    .replace("", "0")
-                )
-                df[target] = pd.to_numeric(cleaned, errors="coerce").fillna(0)
-            else:
-                print(f"Warning: Column not found for {target} in {os.path.basename(f)}. Filled with zeros.")
-                df[target] = 0
-
-        # Compute totals
-        df["Total_Approvals"] = df["Initial_Approvals"] + df["Continuing_Approvals"]
-        df["Total_Denials"] = df["Initial_Denials"] + df["Continuing_Denials"]
-        df["Total_Applications"] = df["Total_Approvals"] + df["Total_Denials"]
-        df["Year"] = year
-        dfs.append(df)
+    # Files are independent; parse them on a thread pool (CSV tokenizing and the
+    # Arrow kernels run largely outside the GIL). map keeps the results in file order.
+    with ThreadPoolExecutor() as pool:
+        dfs = list(pool.map(load_year_file, all_files))
 
     df_all = pd.concat(dfs, ignore_index=True)
 
-    # Final numeric enforcement
+    # Final numeric enforcement (totals are already numeric with blanks as 0; just fix the int type)
     for col in ["Total_Approvals", "Total_Denials", "Total_Applications"]:
-        df_all[col] = pd.to_numeric(df_all[col], errors="coerce").fillna(0).astype(int)
+        df_all[col] = df_all[col].astype(int)
 
     print(f"Loaded {len(df_all):,} total H-1B records from {len(all_files)} files.")
     print("Example yearly totals:")
@@ -96,6 +122,11 @@ def load_and_clean(data_dir="data"):
 # ----------------------------------------------------------------------
 # 3. Integrate Employer Datasets
 # ----------------------------------------------------------------------
+def standardize_employer(names):
+    """Matching key for employer names: text, upper-cased, surrounding whitespace stripped."""
+    return names.astype(str).str.upper().str.strip()
+
+
 def integrate_employers(
     df,
     fortune_path="data/fortune500_opt_companies_2024.csv",
@@ -106,7 +137,7 @@ def integrate_employers(
     # Fortune 500
     fortune = pd.read_csv(fortune_path)
     col = [c for c in fortune.columns if "COMPANY" in c.upper()][0]
-    fortune["Employer_std"] = fortune[col].astype(str).str.upper().str.strip()
+    fortune["Employer_std"] = standardize_employer(fortune[col])
     print("Loaded Fortune 500 dataset.")
 
     # OPT dataset
@@ -114,12 +145,12 @@ def integrate_employers(
         opt = pd.read_csv(opt_path)
         if "Employer_std" not in opt.columns and "Employer" in opt.columns:
             opt["Employer_std"] = opt["Employer"]
-        opt["Employer_std"] = opt["Employer_std"].astype(str).str.upper().str.strip()
+        opt["Employer_std"] = standardize_employer(opt["Employer_std"])
         print("Loaded OPT dataset from local cache.")
     elif get_opt_companies:
         print("Scraping OPT data for the first time...")
         opt = get_opt_companies()
-        opt["Employer_std"] = opt["Employer"].astype(str).str.upper().str.strip()
+        opt["Employer_std"] = standardize_employer(opt["Employer"])
         opt.to_csv(opt_path, index=False)
         print("OPT data saved to cache.")
     else:
@@ -129,29 +160,30 @@ def integrate_employers(
     if os.path.exists(cpt_path):
         cpt = pd.read_csv(cpt_path)
         if "Company" in cpt.columns:
-            cpt["Employer_std"] = cpt["Company"].astype(str).str.upper().str.strip()
+            cpt["Employer_std"] = standardize_employer(cpt["Company"])
         else:
-            cpt["Employer_std"] = cpt.iloc[:, 0].astype(str).str.upper().str.strip()
+            cpt["Employer_std"] = standardize_employer(cpt.iloc[:, 0])
 
         if "CPT Friendly" in cpt.columns:
-            cpt["CPT Friendly"] = cpt["CPT Friendly"].apply(lambda x: str(x).strip() == "✓")
+            cpt["CPT Friendly"] = cpt["CPT Friendly"].astype(str).str.strip() == "✓"
             cpt = cpt[cpt["CPT Friendly"]]
         print("Loaded CPT dataset from local cache.")
     elif get_cpt_companies:
         print("Scraping CPT data for the first time...")
         cpt = get_cpt_companies()
-        cpt["Employer_std"] = cpt["Employer"].astype(str).str.upper().str.strip()
+        cpt["Employer_std"] = standardize_employer(cpt["Employer"])
         cpt.to_csv(cpt_path, index=False)
         print("CPT data saved to cache.")
     else:
         cpt = pd.DataFrame(columns=["Employer_std"])
 
     # Merge and standardize
-    df["Employer_std"] = df["Employer"].astype(str).str.upper().str.strip()
+    df["Employer_std"] = standardize_employer(df["Employer"])
     df["Fortune500"] = df["Employer_std"].isin(fortune["Employer_std"])
     df["OPT_friendly"] = df["Employer_std"].isin(opt["Employer_std"])
     df["CPT_friendly"] = df["Employer_std"].isin(cpt["Employer_std"])
-    df["Flexibility_Index"] = df[["OPT_friendly", "CPT_friendly"]].sum(axis=1)
+    # Element-wise add of the two flag arrays (a row-wise DataFrame sum builds a 2-column temporary)
+    df["Flexibility_Index"] = df["OPT_friendly"].to_numpy(dtype=np.int8) + df["CPT_friendly"].to_numpy(dtype=np.int8)
 
     print(f"Employer integration completed. Total records: {len(df):,}")
     return df
@@ -164,17 +196,20 @@ def eda(df, output_dir="eda"):
     """Generate and save basic exploratory plots."""
     os.makedirs(output_dir, exist_ok=True)
 
-    trend = df.groupby("Year")["Total_Approvals"].sum().reset_index()
+    # One pass over the full frame; both plots marginalize the small (Year, Fortune500) table
+    approvals = df.groupby(["Year", "Fortune500"])["Total_Approvals"].sum()
+
+    trend = approvals.groupby(level="Year").sum()
     plt.figure(figsize=(9, 5))
-    sns.lineplot(data=trend, x="Year", y="Total_Approvals", marker="o")
+    sns.lineplot(x=trend.index, y=trend, marker="o")
     plt.title("H-1B Approvals by Year")
     plt.tight_layout()
     plt.savefig(os.path.join(output_dir, "h1b_approvals_trend.png"))
     plt.close()
 
-    comp = df.groupby("Fortune500")["Total_Approvals"].sum().reset_index()
+    comp = approvals.groupby(level="Fortune500").sum()
     plt.figure(figsize=(6, 4))
-    sns.barplot(data=comp, x="Fortune500", y="Total_Approvals")
+    sns.barplot(x=comp.index, y=comp)
     plt.title("Fortune 500 vs Non-Fortune 500 Approvals")
     plt.tight_layout()
     plt.savefig(os.path.join(output_dir, "fortune500_comparison.png"))
@@ -184,7 +219,81 @@ def eda(df, output_dir="eda"):
 
 
 # ----------------------------------------------------------------------
-# 5. Main Execution
+# 5. Save Typed Parquet Copy (fast load path for app.py)
+# ----------------------------------------------------------------------
+PARQUET_DTYPES = {
+    "Employer": "string[pyarrow]",
+    "Employer_std": "string[pyarrow]",
+    "Fortune500": "int8",
+    "OPT_friendly": "int8",
+    "CPT_friendly": "int8",
+    "Year": "int16",
+    "NAICS": "int32",
+    "Total_Approvals": "int32",
+    "Total_Denials": "int32",
+    "Total_Applications": "int32",
+    "Flexibility_Index": "float32",
+}
+
+
+def save_parquet(df, output_path="data/clean_h1b_data.parquet", chunksize=250_000):
+    """Write the cleaned dataset to zstd-compressed Parquet with compact, pyarrow-backed dtypes."""
+    dtypes = {c: t for c, t in PARQUET_DTYPES.items() if c in df.columns}
+
+    # Fix the schema up front (text columns as strings) so every chunk matches it
+    schema = pa.Schema.from_pandas(df.head(0).astype(dtypes), preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+
+    # Cast and write one row group at a time instead of copying the whole frame
+    with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+        for start in range(0, len(df), chunksize):
+            chunk = df.iloc[start:start + chunksize].astype(dtypes)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    print(f"Parquet copy saved to: {output_path}")
+
+
+# ----------------------------------------------------------------------
+# 6. Save Dashboard Summary Tables (Tab 1 reads these, not the full frame)
+# ----------------------------------------------------------------------
+def save_summaries(df, output_dir="data", top_n=10):
+    """Precompute the per-year and top-employer tables shown in the dashboard's first tab."""
+    # Stamp each table with the frame it came from (row count, total approvals);
+    # the app only uses a table whose stamp matches the data it loaded
+    source = {"source_rows": len(df), "source_approvals": int(df["Total_Approvals"].sum())}
+
+    yearly = (
+        df.groupby("Year")
+        .agg(
+            Total_Approvals=("Total_Approvals", "sum"),
+            Total_Denials=("Total_Denials", "sum"),
+            Fortune500=("Fortune500", "sum"),
+            OPT_friendly=("OPT_friendly", "sum"),
+            CPT_friendly=("CPT_friendly", "sum"),
+            Total_Employers=("Employer_std", "nunique"),
+        )
+        .reset_index()
+    )
+    yearly.attrs.update(source)
+    yearly.to_parquet(os.path.join(output_dir, "yearly.parquet"), engine="pyarrow", index=False)
+
+    # Sorted ascending so the largest employer ends up on top of a horizontal bar chart
+    top_emp = (
+        df.groupby("Employer")["Total_Approvals"]
+        .sum()
+        .nlargest(top_n)
+        .reset_index()
+        .sort_values("Total_Approvals", ascending=True)
+    )
+    top_emp.attrs.update(source)
+    top_emp.to_parquet(os.path.join(output_dir, "top_emp.parquet"), engine="pyarrow", index=False)
+
+    print(f"Summary tables saved to: {output_dir}/ (yearly.parquet, top_emp.parquet)")
+
+
+# ----------------------------------------------------------------------
+# 7. Main Execution
 # ----------------------------------------------------------------------
 if __name__ == "__main__":
     print("=== Starting Data Preparation for H-1B / OPT / CPT Integration ===")
@@ -204,5 +313,11 @@ if __name__ == "__main__":
     df.to_csv(output_path, index=False)
 
     print(f"Dataset successfully saved to: {output_path}")
+
+    # Step 5 — Save typed Parquet copy for the dashboard
+    save_parquet(df, os.path.join("data", "clean_h1b_data.parquet"))
+
+    # Step 6 — Save precomputed Tab 1 summary tables
+    save_summaries(df, output_dir="data")
     print(f"Total records: {len(df):,}")
     print("=== Data preparation pipeline completed successfully ===")
\ No newline at end of file
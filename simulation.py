@@ -4,7 +4,7 @@ import numpy as np
 # ----------------------------------------------------------------------
 # Simulation with Heterogeneous Elasticity
 # ----------------------------------------------------------------------
-def simulate_fee_change(df, alpha=0.1, elasticity_low=-0.5, elasticity_high=-0.2):
+def simulate_fee_change(df, alpha=0.1, elasticity_low=-0.5, elasticity_high=-0.2, verbose=True):
     """
     Simulate the response of employers to changes in H-1B filing fees,
     with heterogeneous elasticity by flexibility level.
@@ -19,6 +19,8 @@ def simulate_fee_change(df, alpha=0.1, elasticity_low=-0.5, elasticity_high=-0.2
         Elasticity for less flexible employers.
     elasticity_high : float
         Elasticity for more flexible employers.
+    verbose : bool
+        Print the elasticity settings after the run (disable for batch runs).
 
     Returns
     -------
@@ -26,30 +28,37 @@ def simulate_fee_change(df, alpha=0.1, elasticity_low=-0.5, elasticity_high=-0.2
         Aggregated results showing baseline and simulated applications by flexibility and year.
     """
 
-    df = df.copy()
+    # Work on NumPy arrays of the needed columns instead of copying the whole frame
 
     # --- Step 1: Discretize flexibility ---
     if "Flexibility_Index" in df.columns:
-        df["Flex_Group"] = np.where(df["Flexibility_Index"] > 0.5, "More Flexible", "Less Flexible")
+        more_flexible = (df["Flexibility_Index"] > 0.5).to_numpy(dtype=bool, na_value=False)
     else:
         raise ValueError("Column 'Flexibility_Index' is missing from dataframe.")
 
     # --- Step 2: Assign elasticity per group ---
-    df["Elasticity"] = np.where(df["Flex_Group"] == "More Flexible", elasticity_high, elasticity_low)
+    elasticity = np.where(more_flexible, elasticity_high, elasticity_low)
 
     # --- Step 3: Apply elasticity to simulate response ---
-    df["Simulated_Total_Applications"] = df["Total_Applications"] * (1 + df["Elasticity"] * alpha)
-    df["Change_%"] = 100 * (df["Simulated_Total_Applications"] / df["Total_Applications"] - 1)
+    applications = df["Total_Applications"].to_numpy()
+    work = pd.DataFrame({
+        "Flex_Group": np.where(more_flexible, "More Flexible", "Less Flexible"),
+        "Total_Applications": applications,
+        "Simulated_Total_Applications": applications * (1 + elasticity * alpha),
+    })
+    if "Year" in df.columns:
+        work.insert(0, "Year", df["Year"].to_numpy())
 
     # --- Step 4: Aggregate results by Year & Flexibility Group ---
-    group_cols = [c for c in ["Year", "Flex_Group"] if c in df.columns]
+    group_cols = [c for c in ["Year", "Flex_Group"] if c in work.columns]
     summary = (
-        df.groupby(group_cols, as_index=False)[["Total_Applications", "Simulated_Total_Applications"]]
+        work.groupby(group_cols, as_index=False)[["Total_Applications", "Simulated_Total_Applications"]]
           .sum()
     )
     summary["Change_%"] = 100 * (summary["Simulated_Total_Applications"] / summary["Total_Applications"] - 1)
 
-    print("Simulation completed with heterogeneous elasticity:")
-    print(f"  Less Flexible  → ε = {elasticity_low}")
-    print(f"  More Flexible  → ε = {elasticity_high}")
+    if verbose:
+        print("Simulation completed with heterogeneous elasticity:")
+        print(f"  Less Flexible  → ε = {elasticity_low}")
+        print(f"  More Flexible  → ε = {elasticity_high}")
     return summary
\ No newline at end of file